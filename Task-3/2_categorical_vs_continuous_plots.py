@@ -1,26 +1,53 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
 from scipy.stats import gaussian_kde
+import argparse
+import os
+import sys
 import warnings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from stratified_sample import sample_csv, group_estimates, WEIGHT
+from frame_backend import PandasBackend, Cut, Hour, Scale, Extract, backend_from_argv
 warnings.filterwarnings('ignore')
 
 def main():
     # Load and prepare data
-    df = pd.read_csv('customer_summary_report.csv')
-    df['Call Start Time'] = pd.to_datetime(df['Call Start Time'])
-    df['Call Start Hour'] = df['Call Start Time'].dt.hour
-    df['Duration_Minutes'] = df['Duration (seconds)'] / 60
-    df['Tower_Number'] = df['Tower ID'].str.extract(r'(\d+)').astype(int)
-    df['Time_Period'] = pd.cut(df['Call Start Hour'], bins=[0, 6, 12, 18, 24], 
-                              labels=['Night', 'Morning', 'Afternoon', 'Evening'], include_lowest=True)
-    df['Duration_Category'] = pd.cut(df['Duration (seconds)'], bins=[0, 30, 300, 600, float('inf')], 
-                                   labels=['Very Short', 'Short', 'Medium', 'Long'])
+    # Pass --sample N for a quick exploratory run on a stratified sample of about N rows
+    # or --backend polars to parse the file and derive the columns with Polars; every
+    # row is still loaded into pandas below, so this script does not run out of core
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--sample', type=int, metavar='N')
+    sample_size = parser.parse_known_args()[0].sample
+    sampled = sample_size is not None
+    if sampled and '--backend' in sys.argv:
+        sys.exit("--sample reads the file with pandas and cannot be combined with --backend")
+    if sampled:
+        backend = PandasBackend()
+        frame = sample_csv('customer_summary_report.csv', 'Tower ID', total_size=sample_size)
+    else:
+        backend = backend_from_argv()
+        frame = backend.load('customer_summary_report.csv')
+    frame = backend.derive(frame, **{
+        'Call Start Hour': Hour('Call Start Time'),
+        'Duration_Minutes': Scale('Duration (seconds)', 1 / 60),
+        'Tower_Number': Extract('Tower ID', r'(\d+)'),
+        'Time_Period': Cut('Call Start Hour', bins=[0, 6, 12, 18, 24],
+                           labels=['Night', 'Morning', 'Afternoon', 'Evening'], include_lowest=True),
+        'Duration_Category': Cut('Duration (seconds)', bins=[0, 30, 300, 600, float('inf')],
+                                 labels=['Very Short', 'Short', 'Medium', 'Long']),
+    })
+    # Every chart and test below works on the rows themselves, so load them once
+    df = backend.collect(frame)
+    # Those views show the stratified sample as drawn, which over-represents small towers
+    view = ' (unweighted sample)' if sampled else ''
     
     print("="*60)
     print("CATEGORICAL vs CONTINUOUS BIVARIATE ANALYSIS")
-    print(f"Dataset: {df.shape[0]} records")
+    if sampled:
+        print(f"Stratified sample: {df.shape[0]} of {df[WEIGHT].sum():.0f} records, by Tower ID")
+    else:
+        print(f"Dataset: {df.shape[0]} records")
     
     # 1. Bar Charts
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
@@ -34,17 +61,24 @@ def main():
     ]
     
     for cat_var, cont_var, ax in chart_data:
-        summary = df.groupby(cat_var)[cont_var].agg(['mean', 'median', 'std']).reset_index()
+        if sampled:
+            # Weighted estimates, with 95% confidence intervals drawn as error bars
+            summary = group_estimates(df, cat_var, cont_var).reset_index()
+            mean_err = [summary['mean'] - summary['mean_low'], summary['mean_high'] - summary['mean']]
+            median_err = [summary['median'] - summary['median_low'], summary['median_high'] - summary['median']]
+        else:
+            summary = df.groupby(cat_var)[cont_var].agg(['mean', 'median', 'std']).reset_index()
+            mean_err = median_err = None
         x_pos = np.arange(len(summary))
         width = 0.25
         
-        ax.bar(x_pos - width, summary['mean'], width, label='Mean', alpha=0.8, color='skyblue')
-        ax.bar(x_pos, summary['median'], width, label='Median', alpha=0.8, color='lightgreen')
+        ax.bar(x_pos - width, summary['mean'], width, yerr=mean_err, capsize=3, label='Mean', alpha=0.8, color='skyblue')
+        ax.bar(x_pos, summary['median'], width, yerr=median_err, capsize=3, label='Median', alpha=0.8, color='lightgreen')
         ax.bar(x_pos + width, summary['std'], width, label='Std', alpha=0.8, color='salmon')
         
         ax.set_xlabel(cat_var)
         ax.set_ylabel(cont_var)
-        ax.set_title(f'{cat_var} vs {cont_var}')
+        ax.set_title(f'{cat_var} vs {cont_var}' + (' (sample, 95% CI)' if sampled else ''))
         ax.set_xticks(x_pos)
         ax.set_xticklabels(summary[cat_var], rotation=45 if len(summary) > 3 else 0)
         ax.legend()
@@ -56,7 +90,7 @@ def main():
     
     # 2. Box and Violin Plots
     fig, axes = plt.subplots(2, 4, figsize=(20, 10))
-    fig.suptitle('Box Plots and Violin Plots', fontsize=16, fontweight='bold')
+    fig.suptitle('Box Plots and Violin Plots' + view, fontsize=16, fontweight='bold')
     
     plot_data = [
         ('Call Type', 'Duration (seconds)'),
@@ -99,7 +133,7 @@ def main():
     
     # 3. Density and Ridgeline Plots
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    fig.suptitle('Grouped Kernel Density and Ridgeline Plots', fontsize=16, fontweight='bold')
+    fig.suptitle('Grouped Kernel Density and Ridgeline Plots' + view, fontsize=16, fontweight='bold')
     
     density_data = [
         ('Call Type', 'Duration (seconds)', axes[0,0]),
@@ -156,7 +190,7 @@ def main():
     
     # 4. Beeswarm Plots
     fig, axes = plt.subplots(1, 3, figsize=(18, 6))
-    fig.suptitle('Beeswarm Plots (Strip Plots with Jitter)', fontsize=16, fontweight='bold')
+    fig.suptitle('Beeswarm Plots (Strip Plots with Jitter)' + view, fontsize=16, fontweight='bold')
     
     beeswarm_data = [
         ('Call Type', 'Duration (seconds)', axes[0]),
@@ -191,10 +225,20 @@ def main():
     print("STATISTICAL TESTS")
     print("="*60)
     
+    if sampled:
+        # The tests assume a simple random sample, so report weighted estimates instead
+        print("\nTests skipped on the stratified sample; weighted estimates with 95% CI:")
+        for cat_var in ['Call Type', 'Call Status']:
+            estimates = group_estimates(df, cat_var, 'Duration (seconds)')
+            print(f"\n{cat_var} vs Duration")
+            for label, row in estimates.iterrows():
+                print(f"  {label}: Mean={row['mean']:.2f} [{row['mean_low']:.2f}, {row['mean_high']:.2f}], "
+                      f"N={row['n']:.0f} of ~{row['population']:.0f}")
+    
     # Call Type vs Duration
     call_types = df['Call Type'].unique()
     groups = [df[df['Call Type'] == ct]['Duration (seconds)'].dropna() for ct in call_types]
-    if len(groups) == 2 and all(len(g) > 0 for g in groups):
+    if not sampled and len(groups) == 2 and all(len(g) > 0 for g in groups):
         t_stat, p_val = stats.ttest_ind(groups[0], groups[1])
         print(f"\nCall Type vs Duration - t-test: t={t_stat:.4f}, p={p_val:.4f}")
         for i, ct in enumerate(call_types):
@@ -204,7 +248,7 @@ def main():
     # Call Status vs Duration
     call_statuses = df['Call Status'].unique()
     groups = [df[df['Call Status'] == cs]['Duration (seconds)'].dropna() for cs in call_statuses]
-    if len(groups) > 2 and all(len(g) > 0 for g in groups):
+    if not sampled and len(groups) > 2 and all(len(g) > 0 for g in groups):
         f_stat, p_val = stats.f_oneway(*groups)
         print(f"\nCall Status vs Duration - ANOVA: F={f_stat:.4f}, p={p_val:.4f}")
         for i, cs in enumerate(call_statuses):
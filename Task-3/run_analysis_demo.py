@@ -7,9 +7,13 @@ This script demonstrates the key results from both analysis scripts
 without complex plotting to avoid display issues.
 """
 
-import pandas as pd
+import os
+import sys
 import numpy as np
 from scipy import stats
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from aggregate_cube import AggregateCube
+from frame_backend import Hour, Scale, Extract, backend_from_argv
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -21,15 +25,25 @@ def analyze_data():
     print("Using customer_summary_report.csv")
     print("="*60)
     
-    # Load data
-    df = pd.read_csv('customer_summary_report.csv')
+    # Load data (--backend polars computes the cube lazily and out of core)
+    backend = backend_from_argv()
+    frame = backend.load('customer_summary_report.csv')
     
     # Prepare data
-    df['Call Start Time'] = pd.to_datetime(df['Call Start Time'])
-    df['Call Start Hour'] = df['Call Start Time'].dt.hour
-    df['Duration_Minutes'] = df['Duration (seconds)'] / 60
-    df['Tower_Number'] = df['Tower ID'].str.extract(r'(\d+)').astype(int)
-    
+    frame = backend.derive(frame, **{
+        'Call Start Hour': Hour('Call Start Time'),
+        'Duration_Minutes': Scale('Duration (seconds)', 1 / 60),
+        'Tower_Number': Extract('Tower ID', r'(\d+)'),
+    })
+    
+    # One scan of the records feeds every per-category summary below
+    cube = AggregateCube.from_backend(
+        backend, frame, ['Call Type', 'Call Status', 'Tower ID', 'Call Start Hour'], 'Duration (seconds)'
+    )
+    
+    # Correlations and significance tests still need the individual rows, so
+    # every row is loaded into pandas here whichever backend built the cube
+    df = backend.collect(frame)
     print(f"Dataset loaded: {df.shape[0]} records, {df.shape[1]} columns")
     
     # 1. CONTINUOUS vs CONTINUOUS ANALYSIS
@@ -80,7 +94,7 @@ def analyze_data():
     
     # Call Type vs Duration
     print("\nCALL TYPE vs DURATION:")
-    call_type_stats = df.groupby('Call Type')[continuous_target].agg(['count', 'mean', 'std'])
+    call_type_stats = cube.rollup(['Call Type']).summary()[['count', 'mean', 'std']]
     print(call_type_stats.round(2))
     
     # Statistical test
@@ -91,7 +105,7 @@ def analyze_data():
     
     # Call Status vs Duration
     print("\nCALL STATUS vs DURATION:")
-    status_stats = df.groupby('Call Status')[continuous_target].agg(['count', 'mean', 'std'])
+    status_stats = cube.rollup(['Call Status']).summary()[['count', 'mean', 'std']]
     print(status_stats.round(2))
     
     # ANOVA test
@@ -103,7 +117,7 @@ def analyze_data():
     
     # Tower ID vs Duration
     print("\nTOWER ID vs DURATION:")
-    tower_stats = df.groupby('Tower ID')[continuous_target].agg(['count', 'mean', 'std'])
+    tower_stats = cube.rollup(['Tower ID']).summary()[['count', 'mean', 'std']]
     print(tower_stats.round(2))
     
     print("\n📊 CATEGORICAL vs CONTINUOUS VISUALIZATIONS:")
@@ -120,28 +134,31 @@ def analyze_data():
     print("="*50)
     
     # Call duration insights
-    voice_duration = df[df['Call Type'] == 'Voice']['Duration (seconds)'].mean()
-    sms_duration = df[df['Call Type'] == 'SMS']['Duration (seconds)'].mean()
+    voice_duration = cube.slice({'Call Type': 'Voice'}).rollup([]).summary()['mean'].iloc[0]
+    sms_duration = cube.slice({'Call Type': 'SMS'}).rollup([]).summary()['mean'].iloc[0]
     
     print(f"📞 Voice calls average {voice_duration:.1f} seconds")
     print(f"📱 SMS messages average {sms_duration:.1f} seconds")
     
     # Status insights
-    connected_rate = (df['Call Status'] == 'Connected').mean() * 100
-    failed_rate = (df['Call Status'] == 'Failed').mean() * 100
+    status_counts = cube.rollup(['Call Status']).cells['count']
+    connected_rate = status_counts.get('Connected', 0) / status_counts.sum() * 100
+    failed_rate = status_counts.get('Failed', 0) / status_counts.sum() * 100
     
     print(f"✅ {connected_rate:.1f}% of calls successfully connected")
     print(f"❌ {failed_rate:.1f}% of calls failed")
     
     # Tower insights
-    busiest_tower = df['Tower ID'].value_counts().index[0]
-    busiest_count = df['Tower ID'].value_counts().iloc[0]
+    tower_counts = cube.rollup(['Tower ID']).cells['count'].sort_values(ascending=False, kind='stable')
+    busiest_tower = tower_counts.index[0]
+    busiest_count = int(tower_counts.iloc[0])
     
     print(f"📡 Busiest tower: {busiest_tower} with {busiest_count} calls")
     
     # Time insights
-    peak_hour = df['Call Start Hour'].mode()[0]
-    peak_count = (df['Call Start Hour'] == peak_hour).sum()
+    hour_counts = cube.rollup(['Call Start Hour']).cells['count']
+    peak_hour = hour_counts.idxmax()
+    peak_count = int(hour_counts.max())
     
     print(f"⏰ Peak calling hour: {peak_hour}:00 with {peak_count} calls")
     
@@ -0,0 +1,149 @@
+"""
+Fast Treemap
+============
+
+NumPy version of the squarified treemap layout used by `squarify`, plus
+nested (multi-level) layouts and a renderer that draws every rectangle as
+one PolyCollection and only labels rectangles that are large enough on
+screen.  Tens of thousands of leaves lay out and draw in about a second,
+where `squarify.plot` spends most of its time creating one patch and one
+text object per rectangle.
+"""
+
+import numpy as np
+import pandas as pd
+from matplotlib.collections import PolyCollection
+
+
+def squarify_layout(sizes, x, y, dx, dy):
+    """Squarified rectangles (x, y, dx, dy) for positive `sizes`, in input order
+
+    Uses the same row-splitting rule as `squarify.squarify`: a row keeps
+    growing while its worst aspect ratio does not get worse.  The worst
+    ratio of every candidate row length is computed at once from a cumulative
+    sum over a window that doubles until the split point is found.
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    n = len(sizes)
+    rects = np.empty((n, 4))
+    if n == 0:
+        return rects
+
+    order = np.argsort(-sizes, kind='stable')
+    values = sizes[order] * (dx * dy / sizes.sum())
+    start = 0
+    window = 64
+    while start < n:
+        remaining = n - start
+        side_sq = min(dx, dy) ** 2
+        while True:
+            count = min(window, remaining)
+            row = values[start:start + count]
+            covered = np.cumsum(row)
+            worst = np.maximum(covered ** 2 / (side_sq * row), side_sq * row[0] / covered ** 2)
+            rising = np.flatnonzero(worst[1:] > worst[:-1])
+            if rising.size or count == remaining:
+                break
+            window *= 2
+        count = rising[0] + 1 if rising.size else count
+        row = row[:count]
+        offsets = np.concatenate(([0.0], covered[:count - 1]))
+        block = rects[start:start + count]
+        if dx >= dy:
+            # Fill a column of height dy on the left, then continue to its right
+            width = covered[count - 1] / dy
+            block[:, 0] = x
+            block[:, 1] = y + offsets / width
+            block[:, 2] = width
+            block[:, 3] = row / width
+            x += width
+            dx -= width
+        else:
+            # Fill a row of width dx at the bottom, then continue above it
+            height = covered[count - 1] / dx
+            block[:, 0] = x + offsets / height
+            block[:, 1] = y
+            block[:, 2] = row / height
+            block[:, 3] = height
+            y += height
+            dy -= height
+        start += count
+
+    result = np.empty_like(rects)
+    result[order] = rects
+    return result
+
+
+def nested_layout(data, levels, value, width=100.0, height=100.0, pad=0.5):
+    """Lay out every level of the `levels` hierarchy, children inside their parent
+
+    Returns one row per node with its `depth`, the hierarchy columns down to
+    that depth, the summed `value` and its rectangle (x, y, dx, dy).  Children
+    are inset by `pad` inside their parent so the parent's border stays visible.
+    """
+    levels = list(levels)
+    frames = []
+    parents = None
+    for depth in range(len(levels)):
+        keys = levels[:depth + 1]
+        nodes = data.groupby(keys, observed=True)[value].sum().reset_index()
+        nodes = nodes[nodes[value] > 0]
+
+        if parents is None:
+            nodes['_parent'] = 0
+            bounds = np.array([[0.0, 0.0, width, height]])
+        else:
+            parent_ids = parents[keys[:-1]].assign(_parent=np.arange(len(parents)))
+            nodes = nodes.merge(parent_ids, on=keys[:-1], how='inner')
+            bounds = parents[['x', 'y', 'dx', 'dy']].to_numpy(dtype=float)
+            # Inset children where the parent is large enough to show the border
+            inset_x = np.where(bounds[:, 2] > 4 * pad, pad, 0.0)
+            inset_y = np.where(bounds[:, 3] > 4 * pad, pad, 0.0)
+            bounds = bounds + np.column_stack([inset_x, inset_y, -2 * inset_x, -2 * inset_y])
+
+        nodes = nodes.sort_values(['_parent', value], ascending=[True, False], kind='stable')
+        parent = nodes['_parent'].to_numpy()
+        sizes = nodes[value].to_numpy(dtype=float)
+        rects = np.empty((len(nodes), 4))
+        splits = np.flatnonzero(np.diff(parent)) + 1
+        for lo, hi in zip(np.concatenate(([0], splits)), np.concatenate((splits, [len(nodes)]))):
+            rects[lo:hi] = squarify_layout(sizes[lo:hi], *bounds[parent[lo]])
+
+        nodes = nodes.drop(columns='_parent').reset_index(drop=True)
+        nodes[['x', 'y', 'dx', 'dy']] = rects
+        nodes['depth'] = depth
+        frames.append(nodes)
+        parents = nodes
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def draw_rectangles(ax, rects, facecolors, edgecolor='white', linewidth=0.5,
+                    labels=None, min_label_area=2500, fontsize=10, **text_kwargs):
+    """Draw `rects` as a single PolyCollection and label only the large ones
+
+    `min_label_area` is in square display pixels at the figure's dpi, so the
+    culling follows the on-screen size of each rectangle rather than its value.
+    """
+    rects = np.asarray(rects, dtype=float)
+    x, y, dx, dy = rects.T
+    verts = np.stack([
+        np.column_stack([x, y]),
+        np.column_stack([x + dx, y]),
+        np.column_stack([x + dx, y + dy]),
+        np.column_stack([x, y + dy]),
+    ], axis=1)
+    collection = PolyCollection(verts, facecolors=facecolors, edgecolors=edgecolor, linewidths=linewidth)
+    ax.add_collection(collection)
+
+    if labels is not None and len(rects):
+        labels = list(labels)
+        ax.autoscale_view()
+        box = ax.get_window_extent()
+        x_lo, x_hi = ax.get_xlim()
+        y_lo, y_hi = ax.get_ylim()
+        pixel_area = dx * dy * (box.width / (x_hi - x_lo)) * (box.height / (y_hi - y_lo))
+        for i in np.flatnonzero(pixel_area >= min_label_area):
+            ax.text(x[i] + dx[i] / 2, y[i] + dy[i] / 2, labels[i], ha='center', va='center',
+                    fontsize=fontsize, clip_on=True, **text_kwargs)
+    return collection
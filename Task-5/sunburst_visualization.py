@@ -1,37 +1,49 @@
-import pandas as pd
-import plotly.express as px
 import os
+import sys
+import plotly.express as px
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from aggregate_cube import AggregateCube
+from drilldown_server import serve
+from frame_backend import Cut, backend_from_argv
 
-# Read the data
+# Read the data (--backend polars aggregates the file lazily and out of core)
 file_path = 'telecom_customer_call_records_100.csv'
-data = pd.read_csv(file_path)
+backend = backend_from_argv()
+data = backend.load(file_path)
 
 # Create call duration categories for better visualization
-def categorize_duration(seconds):
-    if seconds < 300:
-        return 'Very Short (<5 min)'
-    elif seconds < 900:
-        return 'Short (5-15 min)'
-    elif seconds < 1800:
-        return 'Medium (15-30 min)'
-    elif seconds < 3600:
-        return 'Long (30-60 min)'
-    else:
-        return 'Very Long (>60 min)'
-
-data['Duration_Category'] = data['Call_Duration_sec'].apply(categorize_duration)
+data = backend.derive(data, Duration_Category=Cut(
+    'Call_Duration_sec',
+    bins=[float('-inf'), 300, 900, 1800, 3600, float('inf')],
+    labels=['Very Short (<5 min)', 'Short (5-15 min)', 'Medium (15-30 min)', 'Long (30-60 min)', 'Very Long (>60 min)'],
+    right=False
+))
 
 # Prepare data for sunburst chart
 # We'll create a hierarchy: Place > Tower_ID > Duration_Category
-data_for_sunburst = data.copy()
+cube = AggregateCube.from_backend(backend, data, ['Place', 'Tower_ID', 'Duration_Category'], 'Call_Duration_sec')
+
+# With --serve, drill down through the hierarchy in the browser instead of
+# writing one static file that embeds every tower
+if '--serve' in sys.argv:
+    serve(cube, value='sum', chart='sunburst', root_label='All Places',
+          title='Call Duration by Location, Tower, and Duration Category')
+    sys.exit(0)
+
+data_for_sunburst = cube.cells.reset_index()
+data_for_sunburst['Duration_Category'] = data_for_sunburst['Duration_Category'].astype(str)
+data_for_sunburst['Call_Duration_sec'] = data_for_sunburst['sum']
+# Plotly colors each sector by the duration-weighted mean of the raw rows, i.e. sum_sq / sum
+data_for_sunburst['Duration_Color'] = data_for_sunburst['sum_sq'] / data_for_sunburst['sum']
 
 # Create the sunburst chart
 fig = px.sunburst(
     data_for_sunburst,
     path=['Place', 'Tower_ID', 'Duration_Category'],
     values='Call_Duration_sec',
-    color='Call_Duration_sec',
+    color='Duration_Color',
     color_continuous_scale='RdYlGn',
+    labels={'Duration_Color': 'Call_Duration_sec'},
     title='Call Duration by Location, Tower, and Duration Category'
 )
 
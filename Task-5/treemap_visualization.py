@@ -1,25 +1,47 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import squarify
 import os
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from aggregate_cube import AggregateCube
+from fast_treemap import nested_layout, draw_rectangles
+from frame_backend import backend_from_argv
 
-# Read the data
+# Read the data (--backend polars aggregates the file lazily and out of core)
 file_path = 'telecom_customer_call_records_100.csv'
-data = pd.read_csv(file_path)
+backend = backend_from_argv()
+data = backend.load(file_path)
+
+# Total call duration per tower, nested inside its Place
+cube = AggregateCube.from_backend(backend, data, ['Place', 'Tower_ID'], 'Call_Duration_sec')
+tower_call_duration = cube.cells['sum'].astype(int).rename('Call_Duration_sec').reset_index()
 
-# Group data by Place and calculate total call duration
-place_call_duration = data.groupby('Place')['Call_Duration_sec'].sum().reset_index()
-place_call_duration = place_call_duration.sort_values('Call_Duration_sec', ascending=False)
+# Lay out the cities, then the towers inside each city
+layout = nested_layout(tower_call_duration, ['Place', 'Tower_ID'], 'Call_Duration_sec', width=120, height=80)
+places = layout[layout['depth'] == 0]
+towers = layout[layout['depth'] == 1]
 
-# Create TreeMap
-plt.figure(figsize=(12, 8))
-squarify.plot(sizes=place_call_duration['Call_Duration_sec'], 
-              label=[f"{place}\n{duration:,} sec" for place, duration in zip(place_call_duration['Place'], place_call_duration['Call_Duration_sec'])], 
-              alpha=0.8,
-              color=plt.cm.Spectral_r(range(len(place_call_duration))))
+# One color per city spread over the whole colormap, however many cities there are
+place_colors = plt.cm.Spectral_r(np.linspace(0, 1, len(places)))
+place_colors[:, 3] = 0.8
+color_by_place = dict(zip(places['Place'], place_colors))
+
+# Create TreeMap: towers as one collection, cities outlined on top.
+# Labels are only drawn for rectangles big enough on screen to hold them.
+fig, ax = plt.subplots(figsize=(12, 8))
+ax.set_xlim(0, 120)
+ax.set_ylim(0, 80)
+draw_rectangles(ax, towers[['x', 'y', 'dx', 'dy']].to_numpy(),
+                [color_by_place[place] for place in towers['Place']],
+                labels=[f"{tower}\n{duration:,} sec" for tower, duration in zip(towers['Tower_ID'], towers['Call_Duration_sec'])],
+                min_label_area=6000, fontsize=7)
+draw_rectangles(ax, places[['x', 'y', 'dx', 'dy']].to_numpy(), 'none', edgecolor='black', linewidth=1.5,
+                labels=[f"{place}\n{duration:,} sec" for place, duration in zip(places['Place'], places['Call_Duration_sec'])],
+                fontsize=11, fontweight='bold',
+                bbox=dict(facecolor='white', alpha=0.7, edgecolor='none'))
 
 plt.axis('off')
-plt.title('Call Duration by City (TreeMap)', fontsize=16)
+plt.title('Call Duration by City and Tower (TreeMap)', fontsize=16)
 
 # Save the figure
 plt.tight_layout()
@@ -27,4 +49,3 @@ plt.savefig('treemap_visualization.png', dpi=300, bbox_inches='tight')
 plt.close()
 
 print(f"TreeMap visualization saved as 'treemap_visualization.png'")
-
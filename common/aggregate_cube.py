@@ -0,0 +1,106 @@
+"""
+Aggregate Cube
+==============
+
+Materialized count / sum / sum-of-squares / min / max of one measure for
+every combination of a set of categorical dimensions.  The cube is built
+with a single scan of the raw data; every chart is then drawn from cheap
+roll-up and slice queries on the (small) cell table.
+"""
+
+import numpy as np
+import pandas as pd
+
+CELL_STATS = ['count', 'sum', 'sum_sq', 'min', 'max']
+ROLLUP_FUNCS = {'count': 'sum', 'sum': 'sum', 'sum_sq': 'sum', 'min': 'min', 'max': 'max'}
+
+
+class AggregateCube:
+    """Per-cell statistics of `measure` over the `dimensions` of a call-record frame"""
+
+    def __init__(self, cells, dimensions, measure):
+        self.cells = cells
+        self.dimensions = list(dimensions)
+        self.measure = measure
+
+    @classmethod
+    def from_frame(cls, data, dimensions, measure):
+        """Build the cube with one groupby pass over the raw rows"""
+        dimensions = list(dimensions)
+        values = data[measure].astype(float)
+        frame = data[dimensions].assign(_value=values, _value_sq=values ** 2)
+        cells = frame.groupby(dimensions, observed=True, dropna=False).agg(
+            count=('_value', 'count'),
+            sum=('_value', 'sum'),
+            sum_sq=('_value_sq', 'sum'),
+            min=('_value', 'min'),
+            max=('_value', 'max')
+        )
+        return cls(cells, dimensions, measure)
+
+    @classmethod
+    def from_backend(cls, backend, frame, dimensions, measure):
+        """Build the cube with one aggregation query on a frame_backend frame"""
+        dimensions = list(dimensions)
+        # Keep null-key cells, like from_frame, so roll-ups still count every row
+        cells = backend.groupby_agg(frame, dimensions, {
+            'count': (measure, 'count'),
+            'sum': (measure, 'sum'),
+            'sum_sq': (measure, 'sum_sq'),
+            'min': (measure, 'min'),
+            'max': (measure, 'max'),
+        }, dropna=False)
+        cells['count'] = cells['count'].astype('int64')
+        cells[['sum', 'sum_sq', 'min', 'max']] = cells[['sum', 'sum_sq', 'min', 'max']].astype(float)
+        return cls(cells, dimensions, measure)
+
+    def merge(self, other):
+        """Combine with a cube built over other rows of the same dimensions and measure"""
+        if other.dimensions != self.dimensions or other.measure != self.measure:
+            raise ValueError("Can only merge cubes with the same dimensions and measure")
+        cells = pd.concat([self.cells, other.cells])
+        if len(self.cells) and len(other.cells):
+            cells = cells.groupby(level=self.dimensions, observed=True, dropna=False).agg(ROLLUP_FUNCS)
+        return AggregateCube(cells, self.dimensions, self.measure)
+
+    def rollup(self, dimensions):
+        """Aggregate away every dimension not listed in `dimensions`"""
+        dimensions = list(dimensions)
+        unknown = [dim for dim in dimensions if dim not in self.dimensions]
+        if unknown:
+            raise KeyError(f"Unknown cube dimensions: {unknown}")
+        if not dimensions:
+            totals = self.cells[CELL_STATS].agg(ROLLUP_FUNCS)
+            return AggregateCube(totals.to_frame().T, [], self.measure)
+        cells = self.cells.groupby(level=dimensions, observed=True, dropna=False).agg(ROLLUP_FUNCS)
+        return AggregateCube(cells, dimensions, self.measure)
+
+    def slice(self, criteria):
+        """Keep only the cells whose dimension values match `criteria`
+
+        Each value in `criteria` may be a single label or a list of labels.
+        """
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, wanted in criteria.items():
+            if dim not in self.dimensions:
+                raise KeyError(f"Unknown cube dimension: {dim}")
+            if not isinstance(wanted, (list, tuple, set)):
+                wanted = [wanted]
+            mask &= self.cells.index.get_level_values(dim).isin(list(wanted))
+        return AggregateCube(self.cells[mask], self.dimensions, self.measure)
+
+    def summary(self):
+        """Cell statistics plus the derived mean and sample standard deviation"""
+        table = self.cells.copy()
+        count = table['count']
+        table['mean'] = table['sum'] / count.where(count > 0)
+        variance = (table['sum_sq'] - table['sum'] ** 2 / count.where(count > 0)) / (count - 1).where(count > 1)
+        table['std'] = np.sqrt(variance.clip(lower=0))
+        return table
+
+    def crosstab(self, rows, columns):
+        """Call counts with `rows` down the side and `columns` across, like pd.crosstab"""
+        counts = self.rollup([rows, columns]).cells['count']
+        labels = counts.index
+        counts = counts[labels.get_level_values(rows).notna() & labels.get_level_values(columns).notna()]
+        return counts.unstack(columns, fill_value=0).astype(int)
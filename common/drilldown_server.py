@@ -0,0 +1,178 @@
+"""
+Drill-down Server
+=================
+
+Small local HTTP server for exploring an aggregate cube as a treemap or
+sunburst.  The page only ever holds one node and its children: clicking a
+sector fetches the next level from a pre-built per-level aggregate index,
+with an LRU cache over the computed subtrees, instead of baking the whole
+Place -> Tower -> bucket hierarchy into one static HTML file.
+"""
+
+import html
+import json
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE_HTML__</title>
+<script src="/plotly.js"></script>
+</head>
+<body style="margin:0;font-family:sans-serif">
+<div id="crumbs" style="padding:8px 16px"></div>
+<div id="chart" style="width:100vw;height:90vh"></div>
+<script>
+const chartType = __CHART__;
+const title = __TITLE__;
+const rootLabel = __ROOT__;
+const rootId = "__root__";
+let path = [];
+
+function render(children) {
+  const total = children.reduce((sum, child) => sum + child.value, 0);
+  const current = path.length ? path[path.length - 1] : rootLabel;
+  Plotly.react("chart", [{
+    type: chartType,
+    ids: [rootId].concat(children.map(child => child.label)),
+    labels: [current].concat(children.map(child => child.label)),
+    parents: [""].concat(children.map(() => rootId)),
+    values: [total].concat(children.map(child => child.value)),
+    customdata: [[null, null]].concat(children.map(child => [child.count, child.mean])),
+    branchvalues: "total",
+    hovertemplate: "<b>%{label}</b><br>Calls: %{customdata[0]}<br>Avg Duration: %{customdata[1]:.1f} sec<extra></extra>"
+  }], {title: title, margin: {t: 50, l: 25, r: 25, b: 25}, font: {size: 14}});
+  document.getElementById("crumbs").textContent =
+    [rootLabel].concat(path).join(" / ") + "  (click a sector to drill down, the centre to go back)";
+}
+
+function load() {
+  const query = path.map(label => "node=" + encodeURIComponent(label)).join("&");
+  fetch("/children?" + query).then(response => response.json()).then(render);
+}
+
+function onClick(event) {
+  const point = event.points[0];
+  if (point.id === rootId) {
+    if (path.length) { path.pop(); load(); }
+  } else if (path.length < __DEPTH__ - 1) {
+    path.push(point.label);
+    load();
+  }
+  // Returning false stops Plotly zooming client-side; the next level comes from the server
+  return false;
+}
+
+Plotly.newPlot("chart", [], {}).then(chart => {
+  chart.on("plotly_" + chartType + "click", onClick);
+  load();
+});
+</script>
+</body>
+</html>
+"""
+
+
+class DrilldownIndex:
+    """Per-level roll-ups of a cube, sorted for fast child lookups"""
+
+    def __init__(self, cube, value='count', cache_size=4096):
+        self.dimensions = cube.dimensions
+        self.value = value
+        self.levels = []
+        for depth in range(1, len(self.dimensions) + 1):
+            # Sort on the original labels so buckets keep their category order
+            level = cube.rollup(self.dimensions[:depth]).summary().sort_index().reset_index()
+            level['_order'] = range(len(level))
+            # Labels arrive as strings from the URL, so index on their string form
+            for dim in self.dimensions[:depth]:
+                level[dim] = level[dim].astype(str)
+            self.levels.append(level.set_index(self.dimensions[:depth]).sort_index())
+        self.payload = lru_cache(maxsize=cache_size)(self._payload)
+
+    def children(self, path):
+        """Children of the node at `path` (a tuple of labels) as JSON-ready dicts"""
+        depth = len(path)
+        if depth >= len(self.levels):
+            return ()
+        level = self.levels[depth]
+        if depth:
+            try:
+                level = level.xs(path, level=list(range(depth)))
+            except KeyError:
+                return ()
+        level = level.sort_values('_order')
+        return tuple(
+            {
+                'label': str(label),
+                'value': float(row[self.value]),
+                'count': int(row['count']),
+                'mean': None if row['mean'] != row['mean'] else float(row['mean']),
+            }
+            for label, row in zip(level.index, level.to_dict('records'))
+        )
+
+    def _payload(self, path):
+        """Encoded JSON response for `path`; cached per node by `payload`"""
+        return json.dumps(list(self.children(path))).encode('utf-8')
+
+
+def _js_string(text):
+    """`text` as a JavaScript string literal that is safe inside a <script> block"""
+    return json.dumps(text).replace('</', '<\\/')
+
+
+def make_handler(index, page, plotly_js):
+    """Request handler class bound to one index, page and copy of plotly.js"""
+
+    class DrilldownHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/':
+                self._send(page.encode('utf-8'), 'text/html; charset=utf-8')
+            elif url.path == '/plotly.js':
+                self._send(plotly_js, 'application/javascript; charset=utf-8')
+            elif url.path == '/children':
+                path = tuple(parse_qs(url.query).get('node', []))
+                self._send(index.payload(path), 'application/json')
+            else:
+                self.send_error(404)
+
+        def _send(self, body, content_type):
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return DrilldownHandler
+
+
+def serve(cube, value='count', chart='treemap', title='Telecom Call Distribution',
+          root_label='All Calls', host='127.0.0.1', port=8050):
+    """Serve the cube as a lazily loaded treemap or sunburst until interrupted"""
+    from plotly.offline import get_plotlyjs
+
+    index = DrilldownIndex(cube, value=value)
+    page = (PAGE_TEMPLATE
+            .replace('__TITLE_HTML__', html.escape(title))
+            .replace('__TITLE__', _js_string(title))
+            .replace('__CHART__', _js_string(chart))
+            .replace('__ROOT__', _js_string(root_label))
+            .replace('__DEPTH__', str(len(cube.dimensions))))
+    # Served locally, like the embedded copy plotly.offline.plot writes, so it works offline
+    plotly_js = get_plotlyjs().encode('utf-8')
+    server = ThreadingHTTPServer((host, port), make_handler(index, page, plotly_js))
+    print(f"Serving drill-down {chart} at http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,244 @@
+"""
+Frame Backends
+==============
+
+Thin interface over the dataframe engine used by the analysis scripts:
+load, filter, derive columns, group-by aggregation and crosstab.
+
+- `PandasBackend` keeps the existing eager pandas behaviour.
+- `PolarsBackend` builds a lazy Polars query over the CSV that only runs,
+  multi-threaded and streaming, when an aggregate is asked for.
+
+Aggregates always come back as small pandas frames, so the plotting code is
+the same whichever engine computed them.  Only the aggregates run out of
+core: `collect` loads every selected row into pandas on either backend.
+Pick the engine with `--backend polars` on the command line (default:
+pandas).
+"""
+
+import argparse
+
+import pandas as pd
+
+AGG_FUNCS = ('count', 'sum', 'sum_sq', 'mean', 'median', 'std', 'min', 'max')
+
+
+class Cut:
+    """Bucket `column` into `labels` at `bins`, like pd.cut; values outside become null"""
+
+    def __init__(self, column, bins, labels, right=True, include_lowest=False):
+        self.column = column
+        self.bins = list(bins)
+        self.labels = list(labels)
+        self.right = right
+        self.include_lowest = include_lowest
+
+
+class Scale:
+    """`column` multiplied by `factor`"""
+
+    def __init__(self, column, factor):
+        self.column = column
+        self.factor = factor
+
+
+class Hour:
+    """Hour of day of a timestamp string column"""
+
+    def __init__(self, column):
+        self.column = column
+
+
+class Extract:
+    """First integer group of `pattern` matched in a string column"""
+
+    def __init__(self, column, pattern):
+        self.column = column
+        self.pattern = pattern
+
+
+class PandasBackend:
+    """Eager pandas: every step runs immediately on an in-memory DataFrame"""
+
+    name = 'pandas'
+
+    def load(self, path, **read_csv_kwargs):
+        return pd.read_csv(path, **read_csv_kwargs)
+
+    def from_pandas(self, data):
+        return data
+
+    def filter(self, frame, column, op, value):
+        values = frame[column]
+        masks = {
+            '==': lambda: values == value,
+            '!=': lambda: values != value,
+            '<': lambda: values < value,
+            '<=': lambda: values <= value,
+            '>': lambda: values > value,
+            '>=': lambda: values >= value,
+            'in': lambda: values.isin(list(value)),
+        }
+        return frame[masks[op]()]
+
+    def derive(self, frame, **exprs):
+        frame = frame.copy()
+        for name, expr in exprs.items():
+            if isinstance(expr, Cut):
+                frame[name] = pd.cut(frame[expr.column], bins=expr.bins, labels=expr.labels,
+                                     right=expr.right, include_lowest=expr.include_lowest)
+            elif isinstance(expr, Scale):
+                frame[name] = frame[expr.column] * expr.factor
+            elif isinstance(expr, Hour):
+                frame[name] = pd.to_datetime(frame[expr.column]).dt.hour
+            elif isinstance(expr, Extract):
+                frame[name] = frame[expr.column].str.extract(expr.pattern, expand=False).astype(int)
+            else:
+                raise TypeError(f"Unsupported expression: {expr!r}")
+        return frame
+
+    def groupby_agg(self, frame, keys, aggs, dropna=True):
+        """`aggs` maps output name -> (column, function); result is indexed by `keys`
+
+        Rows with a null key are dropped, as in `DataFrame.groupby`, unless
+        `dropna` is False.
+        """
+        keys = list(keys)
+        columns = {}
+        named = {}
+        for output, (column, func) in aggs.items():
+            if func not in AGG_FUNCS:
+                raise ValueError(f"Unsupported aggregation: {func}")
+            if func == 'sum_sq':
+                squared = f'_{column}_sq'
+                columns[squared] = frame[column].astype(float) ** 2
+                named[output] = (squared, 'sum')
+            else:
+                named[output] = (column, func)
+        source = frame[keys + sorted({column for column, _ in aggs.values()})].assign(**columns)
+        return source.groupby(keys, observed=True, dropna=dropna).agg(**named).sort_index()
+
+    def crosstab(self, frame, rows, columns):
+        return pd.crosstab(frame[rows], frame[columns])
+
+    def collect(self, frame, columns=None):
+        return frame if columns is None else frame[list(columns)].copy()
+
+
+class PolarsBackend:
+    """Lazy Polars: steps build a query plan that runs streaming when an aggregate or collect asks for it"""
+
+    name = 'polars'
+
+    def __init__(self):
+        try:
+            import polars
+            import pyarrow  # noqa: F401, needed by polars' to_pandas
+        except ImportError:
+            raise ImportError("The polars backend needs 'polars' and 'pyarrow' (pip install polars pyarrow)")
+        self.pl = polars
+
+    def load(self, path, **scan_csv_kwargs):
+        return self.pl.scan_csv(path, **scan_csv_kwargs)
+
+    def from_pandas(self, data):
+        return self.pl.from_pandas(data).lazy()
+
+    def filter(self, frame, column, op, value):
+        col = self.pl.col(column)
+        predicates = {
+            '==': lambda: col == value,
+            '!=': lambda: col != value,
+            '<': lambda: col < value,
+            '<=': lambda: col <= value,
+            '>': lambda: col > value,
+            '>=': lambda: col >= value,
+            'in': lambda: col.is_in(list(value)),
+        }
+        return frame.filter(predicates[op]())
+
+    def _cut(self, expr):
+        pl = self.pl
+        col = pl.col(expr.column)
+        bucket = pl.lit(None, dtype=pl.String)
+        # Chain from the last interval back so the first matching bucket wins
+        intervals = list(zip(expr.bins[:-1], expr.bins[1:], expr.labels))
+        for i, (low, high, label) in reversed(list(enumerate(intervals))):
+            # As in pd.cut, include_lowest only closes the first interval on the left
+            if expr.right:
+                above = col >= low if expr.include_lowest and i == 0 else col > low
+                inside = above & (col <= high)
+            else:
+                inside = (col >= low) & (col < high)
+            bucket = pl.when(inside).then(pl.lit(label)).otherwise(bucket)
+        return bucket.cast(pl.Enum([str(label) for label in expr.labels]))
+
+    def derive(self, frame, **exprs):
+        pl = self.pl
+        # One with_columns per expression, so later ones can use earlier results
+        for name, expr in exprs.items():
+            if isinstance(expr, Cut):
+                column = self._cut(expr)
+            elif isinstance(expr, Scale):
+                column = pl.col(expr.column) * expr.factor
+            elif isinstance(expr, Hour):
+                column = pl.col(expr.column).str.to_datetime().dt.hour().cast(pl.Int64)
+            elif isinstance(expr, Extract):
+                column = pl.col(expr.column).str.extract(expr.pattern, 1).cast(pl.Int64)
+            else:
+                raise TypeError(f"Unsupported expression: {expr!r}")
+            frame = frame.with_columns(column.alias(name))
+        return frame
+
+    def groupby_agg(self, frame, keys, aggs, dropna=True):
+        pl = self.pl
+        keys = list(keys)
+        if dropna:
+            frame = frame.filter(pl.all_horizontal([pl.col(key).is_not_null() for key in keys]))
+        exprs = []
+        for output, (column, func) in aggs.items():
+            col = pl.col(column)
+            if func not in AGG_FUNCS:
+                raise ValueError(f"Unsupported aggregation: {func}")
+            if func == 'sum_sq':
+                expr = (col.cast(pl.Float64) ** 2).sum()
+            else:
+                expr = getattr(col, func)()
+            exprs.append(expr.alias(output))
+        result = frame.group_by(keys).agg(exprs).collect(engine='streaming')
+        # Enum buckets come back as pandas Categoricals, so they keep their order
+        return result.to_pandas().set_index(keys).sort_index()
+
+    def crosstab(self, frame, rows, columns):
+        counts = (frame.filter(self.pl.col(rows).is_not_null() & self.pl.col(columns).is_not_null())
+                  .group_by([rows, columns]).len().collect(engine='streaming'))
+        table = counts.to_pandas().set_index([rows, columns])['len']
+        table = table.unstack(columns, fill_value=0).astype('int64').sort_index()
+        return table.rename_axis(index=rows, columns=columns)
+
+    def collect(self, frame, columns=None):
+        if columns is not None:
+            frame = frame.select(list(columns))
+        return frame.collect(engine='streaming').to_pandas()
+
+
+BACKENDS = {'pandas': PandasBackend, 'polars': PolarsBackend}
+
+
+def get_backend(name='pandas'):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}', expected one of {sorted(BACKENDS)}")
+
+
+def backend_from_argv(argv=None):
+    """Backend named by `--backend NAME` in the command line arguments
+
+    Other arguments are left for the calling script; a missing or unknown
+    name exits with a usage error.
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='pandas')
+    args, _ = parser.parse_known_args(None if argv is None else argv[1:])
+    return get_backend(args.backend)
@@ -0,0 +1,149 @@
+"""
+Stratified Sampling
+===================
+
+Streaming stratified sampler for exploratory runs on call-record files
+too large to plot in full.  Rows are streamed in chunks and every value of
+a categorical key (e.g. `Tower ID` or `Place`) keeps a minimum number of
+rows, so small towers and rare call statuses are never sampled away the way
+they are by a uniform `df.sample`.
+
+Every sampled row carries a `_weight` (stratum size / rows sampled from it),
+and `group_estimates` turns the weighted sample into means and medians with
+confidence intervals for the chart annotations.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+WEIGHT = '_weight'
+PRIORITY = '_priority'
+Z_95 = 1.959964
+
+
+class StratifiedSampler:
+    """Priority sampler over the strata of `key`, filled from streamed chunks
+
+    Every row gets a uniform random priority, and two bottom-k samples are
+    kept: the `total_size` lowest priorities overall, and the
+    `min_per_stratum` lowest within each stratum.  Both are prefixes of a
+    stratum's rows ordered by priority, so their union is a uniform sample of
+    the stratum.  Memory is bounded by total_size + strata * min_per_stratum
+    rows, whatever the file size.
+
+    The final sample has about `total_size` rows, allocated to strata in
+    proportion to their size but never fewer than `min_per_stratum` rows
+    (or the whole stratum, if it is smaller).
+    """
+
+    def __init__(self, key, total_size=5000, min_per_stratum=30, seed=0):
+        self.key = key
+        self.total_size = total_size
+        self.min_per_stratum = min_per_stratum
+        self.rng = np.random.default_rng(seed)
+        self.overall = None
+        self.per_stratum = None
+        self.population = pd.Series(dtype=np.int64)
+
+    def update(self, chunk):
+        chunk = chunk.assign(**{PRIORITY: self.rng.random(len(chunk))})
+        counts = chunk[self.key].value_counts(dropna=False)
+        self.population = self.population.add(counts, fill_value=0).astype(np.int64)
+        self.overall = self._lowest(self.overall, chunk, self.total_size)
+        self.per_stratum = self._lowest(self.per_stratum, chunk, self.min_per_stratum, by_stratum=True)
+
+    def _lowest(self, kept, chunk, size, by_stratum=False):
+        """The `size` lowest-priority rows of `kept` and `chunk`, overall or per stratum"""
+        if kept is not None and not by_stratum and len(kept) >= size:
+            # Only rows below the current cut-off can enter a full sample
+            chunk = chunk[chunk[PRIORITY] < kept[PRIORITY].iloc[-1]]
+        rows = pd.concat([kept, chunk], ignore_index=True).sort_values(PRIORITY, kind='stable')
+        if by_stratum:
+            return rows.groupby(self.key, sort=False, dropna=False).head(size)
+        return rows.head(size)
+
+    def allocation(self):
+        """Rows to keep from each stratum and how many of the overall sample to use
+
+        The overall sample is cut to the longest priority prefix for which
+        the strata, each topped up to its minimum, still fit in `total_size`.
+        """
+        floor = np.minimum(self.population, self.min_per_stratum)
+        if floor.sum() > self.total_size:
+            warnings.warn(f"{len(floor)} strata x {self.min_per_stratum} rows per stratum is more than "
+                          f"total_size={self.total_size}; the sample will have {floor.sum()} rows")
+        # Row i of the overall sample adds one row when its stratum already has its minimum
+        strata = self.overall[self.key]
+        rank = strata.groupby(strata, sort=False, dropna=False).cumcount().to_numpy()
+        extra = np.cumsum(rank >= floor.reindex(strata).to_numpy())
+        fits = np.flatnonzero(floor.sum() + extra <= self.total_size)
+        used = fits[-1] + 1 if fits.size else 0
+        from_overall = strata.iloc[:used].value_counts(dropna=False).reindex(floor.index, fill_value=0)
+        return np.maximum(floor, from_overall), used
+
+    def sample(self):
+        """The stratified sample, with a `_weight` column for population estimates"""
+        sizes, used = self.allocation()
+        # Each stratum's share is its lowest priorities, from whichever sample holds more of them
+        rows = pd.concat([self.overall.iloc[:used], self.per_stratum], ignore_index=True)
+        rows = rows.sort_values(PRIORITY, kind='stable').drop_duplicates(PRIORITY)
+        rank = rows.groupby(self.key, sort=False, dropna=False).cumcount()
+        rows = rows[rank.to_numpy() < sizes.reindex(rows[self.key]).to_numpy()]
+        weights = (self.population / sizes).reindex(rows[self.key]).to_numpy()
+        return rows.drop(columns=PRIORITY).assign(**{WEIGHT: weights}).reset_index(drop=True)
+
+
+def sample_csv(path, key, total_size=5000, min_per_stratum=30, chunksize=100_000, seed=0, **read_csv_kwargs):
+    """Stream `path` once and return its stratified sample"""
+    sampler = StratifiedSampler(key, total_size=total_size, min_per_stratum=min_per_stratum, seed=seed)
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+        sampler.update(chunk)
+    return sampler.sample()
+
+
+def _weighted_quantile(values, weights, q):
+    order = np.argsort(values, kind='stable')
+    values, weights = values[order], weights[order]
+    cumulative = (np.cumsum(weights) - 0.5 * weights) / weights.sum()
+    return np.interp(q, cumulative, values)
+
+
+def group_estimates(sample, group, value, z=Z_95):
+    """Weighted mean and median of `value` per `group`, with confidence intervals
+
+    Intervals use the Kish effective sample size of each group's weights:
+    a normal interval for the mean, and the binomial order-statistic interval
+    for the median, both shrunk by the finite-population correction.  Without
+    a `_weight` column every row counts once.
+    """
+    rows = []
+    for label, part in sample.groupby(group, sort=True, observed=True):
+        values = part[value].to_numpy(dtype=float)
+        weights = part[WEIGHT].to_numpy(dtype=float) if WEIGHT in part else np.ones(len(part))
+        keep = ~np.isnan(values)
+        values, weights = values[keep], weights[keep]
+        if len(values) == 0:
+            continue
+        n_eff = weights.sum() ** 2 / (weights ** 2).sum()
+        mean = np.average(values, weights=weights)
+        std = np.sqrt(np.average((values - mean) ** 2, weights=weights) * n_eff / max(n_eff - 1, 1))
+        fpc = np.sqrt(max(1 - len(values) / weights.sum(), 0.0)) if WEIGHT in part else 1.0
+        half_width = z * std / np.sqrt(n_eff) * fpc
+        spread = z * 0.5 / np.sqrt(n_eff) * fpc
+        median_low, median, median_high = _weighted_quantile(
+            values, weights, [max(0.5 - spread, 0.0), 0.5, min(0.5 + spread, 1.0)])
+        rows.append({
+            group: label,
+            'n': len(values),
+            'population': weights.sum(),
+            'mean': mean,
+            'mean_low': mean - half_width,
+            'mean_high': mean + half_width,
+            'median': median,
+            'median_low': median_low,
+            'median_high': median_high,
+            'std': std,
+        })
+    return pd.DataFrame(rows).set_index(group)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from dataset_profiler import DatasetProfile
+
+
+def profile_of(tmp_path, frame, chunksize):
+    path = tmp_path / 'data.csv'
+    frame.to_csv(path, index=False)
+    return DatasetProfile.from_csv(path, chunksize=chunksize), pd.read_csv(path)
+
+
+def test_distinct_count_ignores_chunk_dtype(tmp_path):
+    # The same values are read as int64 in the first pass, and as float64 in the
+    # chunk of the second pass that holds the null
+    values = list(range(1000)) * 2
+    values.insert(1500, None)
+    frame = pd.DataFrame({'n': pd.array(values, dtype='Int64')})
+    profile, _ = profile_of(tmp_path, frame, chunksize=500)
+    assert abs(profile.distinct_counts()['n'] - 1000) <= 20
+
+
+def test_distinct_count_of_bools_with_nulls(tmp_path):
+    frame = pd.DataFrame({'b': pd.array([True, False] * 100 + [None, True], dtype='boolean')})
+    profile, _ = profile_of(tmp_path, frame, chunksize=50)
+    assert profile.distinct_counts()['b'] == 2
+
+
+def test_dtypes_match_a_single_read(tmp_path):
+    frame = pd.DataFrame({
+        'int_with_null_chunk': pd.array(list(range(200)) + [None] * 100, dtype='Int64'),
+        'int': range(300),
+        'bool_with_null': pd.array([True, False] * 100 + [None] * 100, dtype='boolean'),
+        'float': np.arange(300) * 0.5,
+        'text': ['x', 'y', 'z'] * 100,
+    })
+    profile, full = profile_of(tmp_path, frame, chunksize=100)
+    assert profile.dtypes().astype(str).to_dict() == full.dtypes.astype(str).to_dict()
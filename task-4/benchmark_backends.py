@@ -0,0 +1,118 @@
+"""
+Backend Benchmark
+=================
+
+Runs the telecom_analysis.py / tree_visualizations.py aggregation pipeline
+(load -> duration buckets -> Place x Tower x bucket cube -> line graph means
+and stacked bar crosstab) on a large synthetic call-record file with every
+available frame backend, checks that the results are identical and reports
+the timings.
+
+Usage:
+    python benchmark_backends.py [rows] [--backends pandas,polars]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from aggregate_cube import AggregateCube
+from frame_backend import Cut, PandasBackend, get_backend
+
+PLACES = ['Mumbai', 'Delhi', 'Bengaluru', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
+
+
+def write_synthetic_calls(path, rows, towers=5000, chunk=1_000_000, seed=0):
+    """Write `rows` call records in the schema of telecom_customer_call_records_100.csv"""
+    rng = np.random.default_rng(seed)
+    header = True
+    for start in range(0, rows, chunk):
+        size = min(chunk, rows - start)
+        ids = np.arange(start, start + size)
+        pd.DataFrame({
+            'Customer_Number': rng.integers(916000000000, 917000000000, size),
+            'Customer_ID': np.char.add('CUST', ids.astype(str)),
+            'Call_Duration_sec': rng.integers(1, 4000, size),
+            'Tower_ID': np.char.add('TWR', rng.integers(100, 100 + towers, size).astype(str)),
+            'Place': rng.choice(PLACES, size),
+        }).to_csv(path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+
+
+def check_cut(backend):
+    """True if `backend` buckets edge and out-of-range values exactly like pd.cut"""
+    values = pd.DataFrame({'value': [-1.0, 0.0, 2.5, 5.0, 7.5, 10.0, 11.0, np.nan]})
+    reference = PandasBackend()
+    for right in (True, False):
+        for include_lowest in (True, False):
+            cut = Cut('value', [0, 5, 10], ['a', 'b'], right=right, include_lowest=include_lowest)
+            expected = reference.derive(values, bucket=cut)['bucket'].astype(object)
+            actual = backend.collect(backend.derive(backend.from_pandas(values), bucket=cut))['bucket'].astype(object)
+            if not expected.fillna('').equals(actual.fillna('')):
+                return False
+    return True
+
+
+def run_pipeline(backend, path):
+    frame = backend.load(path)
+    frame = backend.derive(frame, Duration_Category=Cut(
+        'Call_Duration_sec', [0, 500, 1500, 2500, 4000], ['Short', 'Medium', 'Long', 'Very Long']))
+    cube = AggregateCube.from_backend(backend, frame, ['Place', 'Tower_ID', 'Duration_Category'], 'Call_Duration_sec')
+    avg_by_place = cube.rollup(['Place']).summary()['mean']
+    call_by_place = cube.crosstab('Place', 'Duration_Category')
+    # Also time the backend's own crosstab, used where no cube is built
+    direct = backend.crosstab(frame, 'Place', 'Duration_Category')
+    return cube, avg_by_place, call_by_place, direct
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the task-4 aggregation pipeline on each frame backend")
+    parser.add_argument('rows', type=int, nargs='?', default=5_000_000)
+    parser.add_argument('--backends', default='pandas,polars', help="comma-separated backend names")
+    args = parser.parse_args()
+    rows = args.rows
+    names = args.backends.split(',')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'calls.csv')
+        print(f"Writing {rows:,} synthetic call records...")
+        write_synthetic_calls(path, rows)
+        print(f"File size: {os.path.getsize(path) / 1e6:.0f} MB")
+
+        results = {}
+        timings = {}
+        for name in names:
+            try:
+                backend = get_backend(name)
+            except ImportError as e:
+                print(f"Skipping {name}: {e}")
+                continue
+            # The synthetic durations never fall on or outside the bin edges, so check those separately
+            print(f"{name:>8}: Cut edge cases {'match' if check_cut(backend) else 'DIFFER from'} pandas")
+            start = time.perf_counter()
+            results[name] = run_pipeline(backend, path)
+            timings[name] = time.perf_counter() - start
+            print(f"{name:>8}: {timings[name]:.2f} s")
+
+    if not results:
+        return
+    # Compare against the first backend that actually ran
+    baseline = next(iter(results))
+    for name, (cube, avg, crosstab, direct) in results.items():
+        ref_cube, ref_avg, ref_crosstab, ref_direct = results[baseline]
+        same = (np.allclose(cube.cells.to_numpy(), ref_cube.cells.to_numpy())
+                and cube.cells.index.equals(ref_cube.cells.index)
+                and np.allclose(avg.to_numpy(), ref_avg.to_numpy())
+                and crosstab.equals(ref_crosstab)
+                and direct.equals(ref_direct))
+        speedup = timings[baseline] / timings[name]
+        print(f"{name:>8}: results {'match' if same else 'DIFFER from'} {baseline}, speedup x{speedup:.1f}")
+
+
+if __name__ == "__main__":
+    main()
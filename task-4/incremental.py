@@ -0,0 +1,122 @@
+"""
+Incremental Aggregation
+=======================
+
+Keeps a persisted aggregate cube per append-only call-record CSV together
+with a byte-offset watermark.  Each refresh parses only the rows appended
+since the previous run and merges their cube into the stored one, so the
+cost of a refresh is proportional to the new data rather than the history.
+"""
+
+import hashlib
+import io
+import os
+import pickle
+
+import pandas as pd
+from aggregate_cube import AggregateCube
+
+FINGERPRINT_BYTES = 4096
+
+
+def state_path_for(file_path, name):
+    """Location of the persisted state for `file_path` under the given cube name"""
+    directory, filename = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory, '.incremental', f'{filename}.{name}.pkl')
+
+
+def _fingerprint(handle, offset):
+    """Hash of the first and last bytes before `offset`
+
+    The tail covers the last complete row under the watermark, so a file
+    rewritten in place with the same header and at least the same size is
+    still noticed.
+    """
+    digest = hashlib.sha1()
+    handle.seek(0)
+    digest.update(handle.read(min(offset, FINGERPRINT_BYTES)))
+    tail_start = max(offset - FINGERPRINT_BYTES, 0)
+    handle.seek(tail_start)
+    digest.update(handle.read(offset - tail_start))
+    return digest.hexdigest()
+
+
+def _load_state(state_path):
+    try:
+        with open(state_path, 'rb') as handle:
+            return pickle.load(handle)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _save_state(state_path, state):
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'wb') as handle:
+        pickle.dump(state, handle)
+    os.replace(tmp_path, state_path)
+
+
+def update_cube(file_path, dimensions, measure, prepare=None, name='cube'):
+    """Return the cube for every complete row of `file_path`, parsing only new rows
+
+    `prepare` derives any computed dimension columns (e.g. duration buckets)
+    from a frame of freshly parsed rows.  A trailing line without a newline is
+    treated as still being written and is picked up on the next refresh.  If
+    the file was truncated or rewritten, or the cube definition changed, the
+    state is rebuilt from scratch.
+    """
+    dimensions = list(dimensions)
+    state_path = state_path_for(file_path, name)
+    state = _load_state(state_path)
+
+    with open(file_path, 'rb') as handle:
+        header = handle.readline()
+        size = os.fstat(handle.fileno()).st_size
+
+        if (state is None
+                or state['header'] != header
+                or state['dimensions'] != dimensions
+                or state['measure'] != measure
+                or state['offset'] > size
+                or state['fingerprint'] != _fingerprint(handle, state['offset'])):
+            state = {
+                'header': header,
+                'dimensions': dimensions,
+                'measure': measure,
+                'offset': len(header),
+                'rows': 0,
+                'fingerprint': None,
+                'cube': None,
+            }
+
+        handle.seek(state['offset'])
+        chunk = handle.read()
+
+    complete = chunk[:chunk.rfind(b'\n') + 1]
+    new_rows = 0
+    if complete.strip():
+        columns = pd.read_csv(io.BytesIO(header), nrows=0).columns
+        frame = pd.read_csv(io.BytesIO(complete), header=None, names=columns)
+        if prepare is not None:
+            frame = prepare(frame)
+        new_rows = len(frame)
+        fresh = AggregateCube.from_frame(frame, dimensions, measure)
+        state['cube'] = fresh if state['cube'] is None else state['cube'].merge(fresh)
+
+    if state['cube'] is None:
+        # Header only so far: start from an empty cube with the right shape
+        empty = pd.read_csv(io.BytesIO(header))
+        if prepare is not None:
+            empty = prepare(empty)
+        state['cube'] = AggregateCube.from_frame(empty, dimensions, measure)
+
+    state['offset'] += len(complete)
+    state['rows'] += new_rows
+    with open(file_path, 'rb') as handle:
+        state['fingerprint'] = _fingerprint(handle, state['offset'])
+    _save_state(state_path, state)
+
+    print(f"Incremental refresh of {os.path.basename(file_path)}: "
+          f"{new_rows} new rows, {state['rows']} total")
+    return state['cube']
@@ -1,46 +1,98 @@
+import argparse
+import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 from plotly.offline import plot
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from aggregate_cube import AggregateCube
+from incremental import update_cube
+from stratified_sample import sample_csv, group_estimates, WEIGHT
+from frame_backend import PandasBackend, Cut, Scale, backend_from_argv
 
-# Read the dataset
-data = pd.read_csv('telecom_customer_call_records_100.csv')
-
-# Add duration in minutes
-data['Call_Duration_min'] = data['Call_Duration_sec'] / 60
-
-# 1. SCATTERPLOT MATRIX
-print("Creating Scatterplot Matrix...")
-scatter_matrix = sns.pairplot(
-    data, 
-    vars=['Call_Duration_sec'], 
-    hue='Place',
-    height=3
-)
-scatter_matrix.fig.suptitle('Scatterplot Matrix - Call Data')
-plt.savefig('scatterplot_matrix.png')
-
-# 2. PARALLEL COORDINATES
-print("Creating Parallel Coordinates Plot...")
-# Create numerical encoding for categorical data
-data['Place_code'] = pd.factorize(data['Place'])[0]
-
-# Create parallel coordinates plot
-fig_parallel = px.parallel_coordinates(
-    data,
-    color='Call_Duration_sec',
-    dimensions=['Call_Duration_sec', 'Place_code'],
-    labels={'Call_Duration_sec': 'Call Duration (sec)', 'Place_code': 'Location'}
-)
-plot(fig_parallel, filename='parallel_coordinates.html', auto_open=False)
+file_path = 'telecom_customer_call_records_100.csv'
+cube_dimensions = ['Place', 'Tower_ID', 'Duration_Category']
+incremental = '--incremental' in sys.argv
+# Pass --sample N for a quick exploratory run on about N rows, stratified by Place
+parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+parser.add_argument('--sample', type=int, metavar='N')
+sample_size = parser.parse_known_args()[0].sample
+if sample_size and '--backend' in sys.argv:
+    sys.exit("--sample reads the file with pandas and cannot be combined with --backend")
+
+# Categorize durations
+duration_bins = [0, 500, 1500, 2500, 4000]
+duration_labels = ['Short', 'Medium', 'Long', 'Very Long']
+duration_category = Cut('Call_Duration_sec', duration_bins, duration_labels)
+
+def add_duration_category(data):
+    return PandasBackend().derive(data, Duration_Category=duration_category)
+
+if incremental:
+    # Only rows appended since the last run are parsed; the row-level charts are skipped
+    cube = update_cube(file_path, cube_dimensions, 'Call_Duration_sec',
+                       prepare=add_duration_category, name='telecom_analysis')
+else:
+    # Read the dataset (--backend polars builds the cube lazily and out of core)
+    if sample_size:
+        backend = PandasBackend()
+        frame = sample_csv(file_path, 'Place', total_size=sample_size)
+        print(f"Stratified sample: {len(frame)} of {frame[WEIGHT].sum():.0f} calls, by Place")
+    else:
+        backend = backend_from_argv()
+        frame = backend.load(file_path)
+
+    # Add duration in minutes and duration categories
+    frame = backend.derive(frame, Call_Duration_min=Scale('Call_Duration_sec', 1 / 60),
+                           Duration_Category=duration_category)
+
+    # One scan builds the cube that the line graph and stacked bar chart read from
+    cube = AggregateCube.from_backend(backend, frame, cube_dimensions, 'Call_Duration_sec')
+
+    # The scatterplot matrix and parallel coordinates need the rows themselves, so
+    # these two columns are loaded into pandas for every row whichever backend is used
+    data = backend.collect(frame, ['Call_Duration_sec', 'Place'] + ([WEIGHT] if sample_size else []))
+
+    # 1. SCATTERPLOT MATRIX
+    print("Creating Scatterplot Matrix...")
+    scatter_matrix = sns.pairplot(
+        data, 
+        vars=['Call_Duration_sec'], 
+        hue='Place',
+        height=3
+    )
+    scatter_matrix.fig.suptitle('Scatterplot Matrix - Call Data')
+    plt.savefig('scatterplot_matrix.png')
+
+    # 2. PARALLEL COORDINATES
+    print("Creating Parallel Coordinates Plot...")
+    # Create numerical encoding for categorical data
+    data['Place_code'] = pd.factorize(data['Place'])[0]
+
+    # Create parallel coordinates plot
+    fig_parallel = px.parallel_coordinates(
+        data,
+        color='Call_Duration_sec',
+        dimensions=['Call_Duration_sec', 'Place_code'],
+        labels={'Call_Duration_sec': 'Call Duration (sec)', 'Place_code': 'Location'}
+    )
+    plot(fig_parallel, filename='parallel_coordinates.html', auto_open=False)
 
 # 3. LINE GRAPH
 print("Creating Line Graph...")
-avg_by_place = data.groupby('Place')['Call_Duration_sec'].mean().sort_values(ascending=False).reset_index()
+avg_by_place = cube.rollup(['Place']).summary()['mean'].rename('Call_Duration_sec')
+avg_by_place = avg_by_place.sort_values(ascending=False).reset_index()
 
 plt.figure(figsize=(10, 5))
 plt.plot(avg_by_place['Place'], avg_by_place['Call_Duration_sec'], marker='o')
+if sample_size and not incremental:
+    # 95% confidence intervals on the sampled means
+    estimates = group_estimates(data, 'Place', 'Call_Duration_sec').reindex(avg_by_place['Place'])
+    plt.fill_between(avg_by_place['Place'], estimates['mean_low'], estimates['mean_high'], alpha=0.2,
+                     label='95% CI (stratified sample)')
+    plt.legend()
 plt.title('Average Call Duration by Location')
 plt.xlabel('Location')
 plt.ylabel('Call Duration (seconds)')
@@ -50,13 +102,12 @@ plt.savefig('line_graph.png')
 
 # 4. STACKED BAR CHART
 print("Creating Stacked Bar Chart...")
-# Categorize durations
-duration_bins = [0, 500, 1500, 2500, 4000]
-duration_labels = ['Short', 'Medium', 'Long', 'Very Long']
-data['Duration_Category'] = pd.cut(data['Call_Duration_sec'], bins=duration_bins, labels=duration_labels)
-
 # Create stacked bar chart
-call_by_place = pd.crosstab(data['Place'], data['Duration_Category'])
+call_by_place = cube.crosstab('Place', 'Duration_Category')
+if sample_size and not incremental:
+    # Scale sampled counts back up to estimated call volumes per Place
+    place_weights = data.groupby('Place')[WEIGHT].first()
+    call_by_place = call_by_place.mul(place_weights, axis=0).round().astype(int)
 call_by_place.plot(kind='bar', stacked=True, figsize=(10, 6))
 plt.title('Call Duration Categories by Location')
 plt.xlabel('Location')
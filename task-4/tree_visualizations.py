@@ -1,25 +1,51 @@
-import pandas as pd
+import os
+import sys
 import plotly.express as px
 from plotly.offline import plot
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from aggregate_cube import AggregateCube
+from incremental import update_cube
+from drilldown_server import serve
+from frame_backend import PandasBackend, Cut, backend_from_argv
 
 # Read the dataset
 file_path = 'telecom_customer_call_records_100.csv'
-data = pd.read_csv(file_path)
+cube_dimensions = ['Place', 'Tower_ID', 'Duration_Category']
 
 # Create duration categories for better visualization
-data['Call_Duration_sec'] = data['Call_Duration_sec'].astype(int)
 bins = [0, 500, 1500, 2500, 4000]
 labels = ['Short', 'Medium', 'Long', 'Very Long']
-data['Duration_Category'] = pd.cut(data['Call_Duration_sec'], bins=bins, labels=labels)
-
-# Convert categorical to string to avoid issues
-data['Duration_Category'] = data['Duration_Category'].astype(str)
+duration_category = Cut('Call_Duration_sec', bins, labels)
+
+def add_duration_category(data):
+    data = PandasBackend().derive(data, Duration_Category=duration_category)
+
+    # Convert categorical to string to avoid issues
+    data['Duration_Category'] = data['Duration_Category'].astype(str)
+    return data
+
+# Build the aggregate cube once; both charts roll it up instead of re-scanning the rows.
+# With --incremental only the rows appended since the previous run are parsed.
+if '--incremental' in sys.argv:
+    cube = update_cube(file_path, cube_dimensions, 'Call_Duration_sec',
+                       prepare=add_duration_category, name='tree_visualizations')
+else:
+    # --backend polars aggregates the file lazily and out of core
+    backend = backend_from_argv()
+    frame = backend.derive(backend.load(file_path), Duration_Category=duration_category)
+    cube = AggregateCube.from_backend(backend, frame, cube_dimensions, 'Call_Duration_sec')
+
+# With --serve, explore the hierarchy level by level in the browser instead of
+# writing static HTML that embeds every tower
+if '--serve' in sys.argv:
+    serve(cube, value='count', chart='treemap', root_label='Telecom_Data',
+          title='Telecom Call Distribution by Location and Duration')
+    sys.exit(0)
 
 # Create aggregated data for tree visualizations
-tree_data = data.groupby(['Place', 'Duration_Category']).agg(
-    call_count=('Customer_ID', 'count'),
-    avg_duration=('Call_Duration_sec', 'mean')
-).reset_index()
+tree_data = cube.rollup(['Place', 'Duration_Category']).summary()
+tree_data = tree_data[['count', 'mean']].rename(columns={'count': 'call_count', 'mean': 'avg_duration'}).reset_index()
+tree_data['Duration_Category'] = tree_data['Duration_Category'].astype(str)
 
 # Add a level for better visualization hierarchy
 tree_data['All_Calls'] = 'Telecom_Data'
@@ -1,17 +1,24 @@
-import pandas as pd
+import os
+import sys
 import plotly.express as px
 from plotly.offline import plot
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from aggregate_cube import AggregateCube
+from frame_backend import Cut, backend_from_argv
 
 # Read data and prepare
-data = pd.read_csv('telecom_customer_call_records_100.csv')
-data['Duration_Category'] = pd.cut(
-    data['Call_Duration_sec'],
+backend = backend_from_argv()
+data = backend.load('telecom_customer_call_records_100.csv')
+data = backend.derive(data, Duration_Category=Cut(
+    'Call_Duration_sec',
     bins=[0, 500, 1500, 2500, 4000],
     labels=['Short', 'Medium', 'Long', 'Very Long']
-).astype(str)
+))
 
 # Aggregate data
-tree_data = data.groupby(['Place', 'Duration_Category']).size().reset_index(name='count')
+cube = AggregateCube.from_backend(backend, data, ['Place', 'Tower_ID', 'Duration_Category'], 'Call_Duration_sec')
+tree_data = cube.rollup(['Place', 'Duration_Category']).cells['count'].reset_index()
+tree_data['Duration_Category'] = tree_data['Duration_Category'].astype(str)
 tree_data['Root'] = 'All Calls'
 
 # 5a) TreeMap